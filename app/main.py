@@ -6,11 +6,13 @@ from bullet import Bullet
 from helper import *
 from powerup import Powerup
 from ship import Ship
+from telemetry import create_telemetry
 
 
 class App:
     def __init__(self):
         pyxel.init(WIDTH, HEIGHT, fps=60, title="Drifter")
+        self.telemetry = create_telemetry()
         self.ship = Ship()
         self.bullets = []
         # Initialize score first so difficulty-based counts use it
@@ -141,6 +143,17 @@ class App:
         target = BASE_MIN_ASTEROIDS + steps * ASTEROIDS_PER_STEP
         return max(BASE_MIN_ASTEROIDS, min(MAX_MIN_ASTEROIDS, int(target)))
 
+    def add_score(self, points: int, reason: str):
+        """Add points and record the score change, plus a difficulty step if the minimum asteroid count rose."""
+        if points <= 0:
+            return
+        min_before = self.current_min_asteroids()
+        self.score += points
+        self.telemetry.record("score", points=points, reason=reason, score=self.score)
+        min_after = self.current_min_asteroids()
+        if min_after != min_before:
+            self.telemetry.record("difficulty", min_asteroids=min_after, score=self.score)
+
     def spawn_asteroid_away(self, min_dist: float, r: int | None = None) -> "Asteroid":
         """Spawn a new asteroid at a random position at least min_dist away from the ship (toroidal).
         Falls back after a number of attempts by relaxing the constraint slightly to avoid infinite loops.
@@ -171,7 +184,9 @@ class App:
             y = (sy + HEIGHT / 2) % HEIGHT
             chosen = (x, y)
         x, y = chosen
-        return Asteroid(x, y, r if r is not None else 8)
+        asteroid = Asteroid(x, y, r if r is not None else 8)
+        self.telemetry.record("spawn", entity="asteroid", x=round(x, 1), y=round(y, 1), r=asteroid.r)
+        return asteroid
 
     def spawn_powerup_away(self, min_dist: float) -> "Powerup":
         sx, sy = self.ship.x, self.ship.y
@@ -189,8 +204,11 @@ class App:
             x = random.uniform(0, WIDTH)
             y = random.uniform(0, HEIGHT)
             if toroidal_dist_sq(x, y, sx, sy) >= min_dist_sq:
-                return Powerup(x, y, kind)
-        return Powerup(sx + min_dist * 2, sy + min_dist * 2, kind)
+                break
+        else:
+            x, y = sx + min_dist * 2, sy + min_dist * 2
+        self.telemetry.record("spawn", entity="powerup", kind=kind, x=round(x, 1), y=round(y, 1))
+        return Powerup(x, y, kind)
 
     def update(self):
         if pyxel.btnp(pyxel.KEY_Q):
@@ -214,6 +232,7 @@ class App:
             self.powerups = []
             self.powerup_spawn_timer = random.randint(POWERUP_SPAWN_MIN, POWERUP_SPAWN_MAX)
             self.laser_timer = 0
+            self.telemetry.record("restart", min_asteroids=self.current_min_asteroids())
 
         # Update ship only if alive
         if self.ship_alive:
@@ -252,7 +271,9 @@ class App:
                 else:
                     surviving_asteroids.append(a)
             self.asteroids = surviving_asteroids
-            self.score += 10 * len(hit_asteroids)
+            for a in hit_asteroids:
+                self.telemetry.record("hit", source="bomb", r=a.r)
+            self.add_score(10 * len(hit_asteroids), "bomb")
             if self.explosion_r > WIDTH:
                 self.explosion = False
 
@@ -286,6 +307,8 @@ class App:
                 dy = min(dy, HEIGHT - dy)
                 if dx * dx + dy * dy <= (a.r + sr) * (a.r + sr):
                     self.ship_alive = False
+                    self.telemetry.record("death", score=self.score, asteroids=len(self.asteroids),
+                                          min_asteroids=self.current_min_asteroids())
                     break
 
         # Handle powerup pickup (wrap-aware) only if ship alive
@@ -303,11 +326,12 @@ class App:
                     if p.kind == 'laser':
                         self.laser_timer = LASER_POWER_DURATION
                     elif p.kind == 'points':
-                        self.score += POINTS_POWER_VALUE
+                        self.add_score(POINTS_POWER_VALUE, "points")
                     elif p.kind == 'bomb':
                         self.explosion = True
                         self.explosion_r = 0
                         self.explosion_x, self.explosion_y = sx, sy
+                    self.telemetry.record("pickup", kind=p.kind)
                     pyxel.play(self.channel_powerup, self.snd_powerup)
                     # consumed, do not keep
                 else:
@@ -339,9 +363,11 @@ class App:
                     pyxel.play(self.channel_asteroid, self.snd_asteroid_break)
                     # split asteroid at hit_index
                     a = self.asteroids[hit_index]
+                    self.telemetry.record("hit", source="laser" if laser_on else "bullet", r=a.r)
                     if a.r > 3:
                         pieces = random.randint(2, 3)
                         child_r = max(2, int(a.r * 0.6))
+                        self.telemetry.record("split", r=a.r, pieces=pieces, child_r=child_r)
                         for _ in range(pieces):
                             child = Asteroid(a.x, a.y, child_r)
                             speed_boost = random.uniform(0.0, 0.3)
@@ -359,7 +385,7 @@ class App:
                     surviving_asteroids.append(a)
 
             if hit_set:
-                self.score += 10 * len(hit_set)
+                self.add_score(10 * len(hit_set), "asteroid")
 
             self.asteroids = surviving_asteroids + new_asteroids
             self.bullets = bullets_to_keep
@@ -441,4 +467,5 @@ class App:
             pyxel.text(2, 10, f"Laser: {secs}s", 12)
 
 
-App()
+if __name__ == "__main__":
+    App()
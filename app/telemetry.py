@@ -0,0 +1,124 @@
+import atexit
+import collections
+import gzip
+import json
+import os
+import sys
+import threading
+import time
+
+import pyxel
+
+# Gameplay telemetry tuning
+# Set DRIFTER_TELEMETRY to a directory to record events there (off by default, e.g. in the web build)
+TELEMETRY_ENV = "DRIFTER_TELEMETRY"
+TELEMETRY_FLUSH_INTERVAL = 1.0  # seconds between background flushes
+TELEMETRY_ROTATE_BYTES = 4 * 1024 * 1024  # uncompressed bytes per file before rotating
+TELEMETRY_MAX_BUFFERED = 100_000  # pending events kept if the writer stalls; oldest are dropped
+
+
+class NullTelemetry:
+    """Stand-in used when telemetry is disabled; every call is a no-op."""
+    def record(self, event: str, **fields):
+        pass
+
+    def close(self):
+        pass
+
+
+class Telemetry:
+    """Structured gameplay event stream.
+    record() only appends a tuple to a bounded deque (atomic, no lock); a daemon thread
+    drains it, serialises to JSONL and writes gzip files that rotate by size.
+    If writing fails the recorder switches itself off instead of buffering forever.
+    """
+    def __init__(self, directory: str, flush_interval: float = TELEMETRY_FLUSH_INTERVAL,
+                 rotate_bytes: int = TELEMETRY_ROTATE_BYTES):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.rotate_bytes = rotate_bytes
+        # pid keeps concurrent games sharing a directory (and a start second) apart
+        self.session = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+        self._buffer = collections.deque(maxlen=TELEMETRY_MAX_BUFFERED)
+        self._stop = threading.Event()
+        self._file = None
+        self._file_index = 0
+        self._file_bytes = 0
+        self._writer = threading.Thread(target=self._run, name="drifter-telemetry", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def record(self, event: str, **fields):
+        # Hot path: stamp and enqueue only, serialisation happens on the writer thread
+        self._buffer.append((pyxel.frame_count, time.time(), event, fields))
+
+    def _discard(self, event: str, **fields):
+        pass
+
+    def close(self):
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._writer.join()
+
+    def _run(self):
+        try:
+            while not self._stop.wait(self.flush_interval):
+                self._flush()
+            self._flush()
+        except Exception as exc:
+            # Unserialisable field, full disk, failed rotate...: stop recording rather than leak memory
+            self.record = self._discard
+            self._buffer.clear()
+            print(f"drifter: telemetry disabled after write error: {exc!r}", file=sys.stderr)
+        finally:
+            if self._file is not None:
+                try:
+                    self._file.close()
+                except OSError:
+                    pass
+                self._file = None
+
+    def _flush(self):
+        lines = []
+        buffer = self._buffer
+        while buffer:
+            frame, ts, event, fields = buffer.popleft()
+            record = {"frame": frame, "t": round(ts, 3), "event": event}
+            record.update(fields)
+            lines.append(json.dumps(record, separators=(",", ":")))
+        if not lines:
+            return
+        data = ("\n".join(lines) + "\n").encode("utf-8")
+        if self._file is None or self._file_bytes >= self.rotate_bytes:
+            self._rotate()
+        self._file.write(data)
+        self._file.flush()
+        self._file_bytes += len(data)
+
+    def _rotate(self):
+        if self._file is not None:
+            self._file.close()
+        self._file = None
+        while self._file is None:
+            self._file_index += 1
+            name = f"drifter-{self.session}-{self._file_index:03d}.jsonl.gz"
+            try:
+                # Exclusive create: never overwrite an existing recording
+                self._file = gzip.open(os.path.join(self.directory, name), "xb")
+            except FileExistsError:
+                pass
+        self._file_bytes = 0
+
+
+def create_telemetry():
+    """Return a Telemetry writer if DRIFTER_TELEMETRY names a directory, else a no-op recorder."""
+    directory = os.environ.get(TELEMETRY_ENV)
+    if not directory:
+        return NullTelemetry()
+    try:
+        return Telemetry(directory)
+    except (OSError, RuntimeError):
+        # No writable directory or no thread support (e.g. browser build): keep playing without telemetry
+        return NullTelemetry()
@@ -0,0 +1,353 @@
+"""Headless replay gate for the game logic in app/main.py.
+
+Replays seeded, scripted sessions through App.update() with a stand-in pyxel
+module (no window, audio or real input), then checks each session against
+bench/baselines.json:
+
+- determinism: a hash of the final state (score, entity counts, positions) and
+  of the gameplay events recorded along the way must match the baseline and be
+  identical on every repeat;
+- cost: the number of Python lines executed inside App.update() over the whole
+  session must not rise above the baseline. Unlike wall-clock time this work
+  proxy is exactly reproducible on any machine, so it can block on any increase;
+  mean and p95 frame times are printed for information only.
+
+Line counts depend on the interpreter, so baselines are recorded with the Python
+version CI uses (see BASELINE_PYTHON).
+
+Usage:
+    python bench/replay.py                # check against baselines, exit 1 on failure
+    python bench/replay.py --no-timing    # check state hashes only (fast)
+    python bench/replay.py --update       # re-record baselines after an intended change
+"""
+import argparse
+import collections
+import hashlib
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_DIR = os.path.join(ROOT, "app")
+BASELINES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+
+# Replay tuning
+REPEATS = 2  # untraced runs per session; hashes must all agree
+LINES_TOLERANCE = 0.0  # allowed relative increase of executed lines; the count is exact, so none
+BASELINE_PYTHON = (3, 13)  # interpreter the committed baselines were recorded with
+
+# Scripted sessions: each segment holds keys down for frames [start, stop).
+# R is tapped every `restart_every` frames so sessions keep playing after a death.
+# Optional `drops` place a powerup of the given kind on the ship at the start of a
+# frame, so pickups, bombs, laser piercing and points scoring are exercised too.
+SESSIONS = {
+    "idle": {
+        "seed": 1,
+        "frames": 1800,
+        "restart_every": 120,
+        "segments": [],
+    },
+    "spin_and_shoot": {
+        "seed": 2,
+        "frames": 3600,
+        "restart_every": 60,
+        "segments": [(0, 3600, ("KEY_D", "KEY_SPACE"))],
+    },
+    "thrust_patrol": {
+        "seed": 3,
+        "frames": 3600,
+        "restart_every": 90,
+        "segments": [
+            (0, 600, ("KEY_W", "KEY_SPACE")),
+            (600, 1200, ("KEY_A", "KEY_SPACE")),
+            (1200, 1800, ("KEY_S", "KEY_D")),
+            (1800, 3600, ("KEY_W", "KEY_A", "KEY_SPACE")),
+        ],
+    },
+    "long_haul": {
+        "seed": 4,
+        "frames": 7200,
+        "restart_every": 45,
+        "segments": [
+            (0, 7200, ("KEY_SPACE",)),
+            (0, 2400, ("KEY_A",)),
+            (2400, 4800, ("KEY_W", "KEY_D")),
+            (4800, 7200, ("KEY_S", "KEY_A")),
+        ],
+    },
+    "bomb_and_points": {
+        "seed": 5,
+        "frames": 2400,
+        "restart_every": 60,
+        "segments": [(0, 2400, ("KEY_A", "KEY_SPACE"))],
+        "drops": [(30, "bomb"), (400, "points"), (900, "bomb"), (1300, "points"), (1800, "bomb")],
+    },
+    "laser_spray": {
+        "seed": 6,
+        "frames": 2400,
+        "restart_every": 60,
+        "segments": [(0, 2400, ("KEY_D", "KEY_SPACE")), (600, 1200, ("KEY_W",))],
+        "drops": [(20, "laser"), (900, "laser"), (1700, "laser")],
+    },
+}
+
+
+class _Noop:
+    """Absorbs pyxel calls that only matter with a window (sound, music, drawing)."""
+    def __call__(self, *args, **kwargs):
+        return self
+
+    def __getattr__(self, name):
+        return self
+
+
+class HeadlessPyxel(types.ModuleType):
+    """Minimal pyxel replacement driven by a session script instead of a keyboard."""
+    def __init__(self):
+        super().__init__("pyxel")
+        self.width = 0
+        self.height = 0
+        self.frame_count = 0
+        self._held = set()
+        self._prev_held = set()
+
+    def __getattr__(self, name):
+        if name.startswith("KEY_"):
+            return name
+        return _Noop()
+
+    def init(self, width, height, **kwargs):
+        self.width = width
+        self.height = height
+
+    def run(self, update, draw):
+        pass
+
+    def quit(self):
+        raise RuntimeError("scripted session pressed quit")
+
+    def btn(self, key):
+        return key in self._held
+
+    def btnp(self, key):
+        return key in self._held and key not in self._prev_held
+
+    def set_keys(self, keys):
+        self._prev_held = self._held
+        self._held = set(keys)
+
+
+class _EventCounter:
+    """Telemetry recorder that tallies events per kind, so replays also prove which paths ran."""
+    def __init__(self):
+        self.counts = collections.Counter()
+
+    def record(self, event: str, **fields):
+        if event == "hit":
+            event = f"hit:{fields['source']}"
+        elif event in ("spawn", "pickup"):
+            event = f"{event}:{fields.get('kind', fields.get('entity'))}"
+        self.counts[event] += 1
+
+    def close(self):
+        pass
+
+
+def load_app_module():
+    """Import app/main.py against the headless pyxel stand-in."""
+    os.environ.pop("DRIFTER_TELEMETRY", None)
+    headless = HeadlessPyxel()
+    sys.modules["pyxel"] = headless
+    if APP_DIR not in sys.path:
+        sys.path.insert(0, APP_DIR)
+    import main as game
+    return game, headless
+
+
+def keys_for_frame(session, frame):
+    keys = set()
+    for start, stop, seg_keys in session["segments"]:
+        if start <= frame < stop:
+            keys.update(seg_keys)
+    if frame % session["restart_every"] == 0:
+        keys.add("KEY_R")
+    return keys
+
+
+def state_hash(app, events):
+    def pos(obj):
+        return [round(obj.x, 6), round(obj.y, 6)]
+
+    state = {
+        "score": app.score,
+        "ship_alive": app.ship_alive,
+        "ship": pos(app.ship) + [round(app.ship.vx, 6), round(app.ship.vy, 6), round(app.ship.angle, 6)],
+        "asteroids": [pos(a) + [a.r] for a in app.asteroids],
+        "bullets": [pos(b) for b in app.bullets],
+        "powerups": [pos(p) + [p.kind, p.ttl] for p in app.powerups],
+        "laser_timer": app.laser_timer,
+        "explosion": app.explosion,
+        "events": dict(sorted(events.items())),
+    }
+    blob = json.dumps(state, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return hashlib.sha256(blob).hexdigest()[:16], state
+
+
+class _LineCounter:
+    """sys.settrace hook counting every game line executed while it is installed.
+    Harness code (e.g. the event counter) is skipped so only app/ changes move the count.
+    """
+    def __init__(self):
+        self.lines = 0
+
+    def __call__(self, frame, event, arg):
+        if event == "call" and frame.f_code.co_filename == __file__:
+            return None
+        if event == "line":
+            self.lines += 1
+        return self
+
+
+def run_session(game, headless, session, trace=False):
+    """Play one session from a fresh seeded App.
+    Returns (state hash, summary, per-frame ns, lines executed or None when not traced).
+    """
+    random.seed(session["seed"])
+    headless.frame_count = 0
+    headless.set_keys(())
+    headless.set_keys(())
+    counter = _EventCounter()
+    game.create_telemetry = lambda: counter
+    app = game.App()
+    drops = dict(session.get("drops", ()))
+    costs = []
+    perf = time.perf_counter_ns
+    tracer = _LineCounter() if trace else None
+    for frame in range(session["frames"]):
+        headless.set_keys(keys_for_frame(session, frame))
+        if frame in drops:
+            app.powerups.append(game.Powerup(app.ship.x, app.ship.y, drops[frame]))
+        if tracer is not None:
+            sys.settrace(tracer)
+            app.update()
+            sys.settrace(None)
+        else:
+            start = perf()
+            app.update()
+            costs.append(perf() - start)
+        headless.frame_count += 1
+    digest, state = state_hash(app, counter.counts)
+    summary = {
+        "score": state["score"],
+        "asteroids": len(state["asteroids"]),
+        "bullets": len(state["bullets"]),
+        "powerups": len(state["powerups"]),
+        "events": state["events"],
+    }
+    return digest, summary, costs, tracer.lines if tracer is not None else None
+
+
+def measure(game, headless, sessions, timing=True):
+    results = {}
+    for name, session in sessions.items():
+        digests = set()
+        costs = []
+        summary = None
+        for _ in range(REPEATS):
+            digest, summary, run_costs, _ = run_session(game, headless, session)
+            digests.add(digest)
+            costs.extend(run_costs)
+        lines = None
+        if timing:
+            digest, _, _, lines = run_session(game, headless, session, trace=True)
+            digests.add(digest)
+        costs.sort()
+        results[name] = {
+            "hash": digests.pop() if len(digests) == 1 else None,
+            "summary": summary,
+            "mean_us": round(statistics.fmean(costs) / 1000, 2),
+            "p95_us": round(costs[int(len(costs) * 0.95)] / 1000, 2),
+            "lines": lines,
+        }
+    return results
+
+
+def check(results, baselines, tolerance, timing=True):
+    failures = []
+    for name, result in results.items():
+        base = baselines.get(name)
+        if base is None:
+            failures.append(f"{name}: no baseline recorded (run with --update)")
+            continue
+        if result["hash"] is None:
+            failures.append(f"{name}: non-deterministic, repeats produced different states")
+        elif result["hash"] != base["hash"]:
+            failures.append(f"{name}: state hash {result['hash']} != baseline {base['hash']} "
+                            f"(now {result['summary']}, was {base['summary']})")
+        if timing and result["lines"] > base["lines"] * (1.0 + tolerance):
+            increase = result["lines"] / base["lines"] - 1.0
+            failures.append(f"{name}: update() executed {result['lines']} lines, "
+                            f"{increase:.2%} more than baseline {base['lines']}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay scripted sessions and compare against baselines.")
+    parser.add_argument("--update", action="store_true", help="record current results as the new baselines")
+    parser.add_argument("--tolerance", type=float, default=LINES_TOLERANCE,
+                        help="allowed relative increase of executed lines (default: %(default)s)")
+    parser.add_argument("--session", action="append", choices=sorted(SESSIONS),
+                        help="only replay the given session (repeatable)")
+    parser.add_argument("--no-timing", dest="timing", action="store_false",
+                        help="skip the traced run and only check state hashes")
+    args = parser.parse_args()
+
+    if sys.version_info[:2] != BASELINE_PYTHON and (args.update or args.timing):
+        expected = ".".join(map(str, BASELINE_PYTHON))
+        print(f"Line-count baselines are recorded with Python {expected}, "
+              f"running {sys.version_info.major}.{sys.version_info.minor}: use that version or --no-timing")
+        return 1
+
+    sessions = {name: SESSIONS[name] for name in (args.session or SESSIONS)}
+    game, headless = load_app_module()
+    results = measure(game, headless, sessions, timing=args.update or args.timing)
+    for name, result in results.items():
+        print(f"{name:16} hash={result['hash']} lines={result['lines']} mean={result['mean_us']:8.2f}us "
+              f"p95={result['p95_us']:8.2f}us {result['summary']}")
+
+    if args.update:
+        baselines = {}
+        if os.path.exists(BASELINES_PATH):
+            with open(BASELINES_PATH) as f:
+                baselines = json.load(f)
+        for name, result in results.items():
+            if result["hash"] is None:
+                print(f"{name}: refusing to record a non-deterministic session")
+                return 1
+            baselines[name] = {"hash": result["hash"], "summary": result["summary"], "lines": result["lines"]}
+        with open(BASELINES_PATH, "w") as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baselines written to {os.path.relpath(BASELINES_PATH, ROOT)}")
+        return 0
+
+    with open(BASELINES_PATH) as f:
+        baselines = json.load(f)
+    failures = check(results, baselines, args.tolerance, args.timing)
+    for failure in failures:
+        print(f"FAIL {failure}")
+    if not failures:
+        print("All sessions match their baselines")
+        cheaper = [name for name, result in results.items()
+                   if args.timing and result["lines"] < baselines[name]["lines"]]
+        if cheaper:
+            print(f"Fewer lines executed than baseline in {', '.join(cheaper)}: record with --update")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())